@@ -1,19 +1,15 @@
 import streamlit as st
 import os
-import logging
+import hashlib
 import pandas as pd
-from src.extractor import SkillExtractor
+from concurrent.futures import ProcessPoolExecutor
+from src.extractor import SkillExtractor, read_pdf_text
 from src.matcher import SkillMatcher, MatchResult
+from src._logging import get_logger
 from typing import List, Tuple, Optional
-from joblib import dump, load
 
 # Set up logging
-logging.basicConfig(
-    filename=os.path.join("logs", 'app.log'),
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__, os.path.join("logs", 'app.log'))
 
 @st.cache_resource
 def load_extractor():
@@ -39,34 +35,94 @@ def load_matcher():
         st.error("Error loading matcher. Please check logs.")
         return None
 
-def save_uploaded_file(uploaded_file, upload_dir: str = "uploads/") -> str:
-    """Save uploaded file to disk and return path."""
-    os.makedirs(upload_dir, exist_ok=True)
-    file_path = os.path.join(upload_dir, uploaded_file.name)
-    with open(file_path, "wb") as f:
-        f.write(uploaded_file.getbuffer())
-    logger.info(f"Saved file: {file_path}")
-    return file_path
-
-def get_cached_skills(file_name: str, cache_dir: str = "cache/") -> Optional[List[str]]:
-    """Load cached skills if available."""
-    os.makedirs(cache_dir, exist_ok=True)
-    cache_path = os.path.join(cache_dir, f"{file_name}_skills.pkl")
-    if os.path.exists(cache_path):
+def _extract_text_worker(data: bytes) -> Optional[str]:
+    """Extract text from an in-memory PDF in a worker process (module-level so it can be pickled)."""
+    try:
+        # Files are already spread across processes, so read each one's pages serially
+        text = read_pdf_text(data, max_workers=1)
+        return text if text.strip() else None
+    except Exception:
+        return None
+
+def extract_texts_parallel(pdfs: List[bytes]) -> List[Optional[str]]:
+    """Extract text from several in-memory PDFs concurrently across worker processes."""
+    if not pdfs:
+        return []
+    max_workers = min(os.cpu_count() or 1, 4, len(pdfs))
+    if max_workers == 1:
+        # A single worker would only add process start-up cost
+        return [_extract_text_worker(data) for data in pdfs]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_extract_text_worker, pdfs))
+
+def read_uploaded_file(uploaded_file) -> Tuple[bytes, str]:
+    """Return the uploaded file's bytes and their content digest."""
+    data = uploaded_file.getvalue()
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    logger.info(f"Read upload: {uploaded_file.name}")
+    return data, digest
+
+@st.cache_data(show_spinner=False, ttl=3600)
+def extract_jd_skills(digest: str, _data: bytes, _file_name: str) -> List[str]:
+    """Extract JD skills, cached on the file content digest."""
+    extractor = load_extractor()
+    text = extractor.extract_text_from_bytes(_data, _file_name, allow_text=True)
+    return extractor.extract_skills(text, is_jd=True) if text else []
+
+class _CacheMiss(Exception):
+    """Raised by cached_cv_skills when a CV has not been extracted yet."""
+
+@st.cache_data(show_spinner=False, ttl=3600)
+def cached_cv_skills(digest: str, _skills: Optional[List[str]] = None) -> List[str]:
+    """Skills for one CV, cached on its file content digest.
+
+    Called with only the digest this is a lookup and raises _CacheMiss, which
+    Streamlit does not cache; called with freshly extracted skills it stores them.
+    """
+    if _skills is None:
+        raise _CacheMiss(digest)
+    return _skills
+
+def _extract_cv_batch(files: List[Tuple[str, bytes]]) -> List[List[str]]:
+    """Extract skills for several CVs: PDF text in parallel, then one NLP batch."""
+    extractor = load_extractor()
+    valid = [
+        i for i, (name, data) in enumerate(files)
+        if extractor.validate_file(name, size_bytes=len(data))
+    ]
+
+    extracted = extract_texts_parallel([files[i][1] for i in valid])
+    texts = []
+    indices = []
+    for i, text in zip(valid, extracted):
+        if text:
+            texts.append(text)
+            indices.append(i)
+        else:
+            logger.error(f"No text extracted from {files[i][0]}")
+
+    results: List[List[str]] = [[] for _ in files]
+    batch_skills = extractor.batch_extract_skills(texts, [False] * len(texts))
+    for i, skills in zip(indices, batch_skills):
+        results[i] = skills
+    return results
+
+def extract_cv_skills(files: List[Tuple[str, bytes, str]]) -> List[List[str]]:
+    """Extract skills for (name, data, digest) CVs, batching only the uncached ones."""
+    results: List[List[str]] = []
+    misses = []
+    for i, (_, _, digest) in enumerate(files):
         try:
-            skills = load(cache_path)
-            logger.info(f"Loaded cached skills for {file_name}")
-            return skills
-        except Exception as e:
-            logger.error(f"Failed to load cache for {file_name}: {str(e)}")
-    return None
-
-def cache_skills(file_name: str, skills: List[str], cache_dir: str = "cache/"):
-    """Cache extracted skills to disk."""
-    os.makedirs(cache_dir, exist_ok=True)
-    cache_path = os.path.join(cache_dir, f"{file_name}_skills.pkl")
-    dump(skills, cache_path)
-    logger.info(f"Cached skills for {file_name}")
+            results.append(cached_cv_skills(digest))
+        except _CacheMiss:
+            results.append([])
+            misses.append(i)
+
+    if misses:
+        batch = _extract_cv_batch([files[i][:2] for i in misses])
+        for i, skills in zip(misses, batch):
+            results[i] = cached_cv_skills(files[i][2], skills)
+    return results
 
 def main():
     st.title("CV/JD Analysis and Selection Tool")
@@ -89,14 +145,8 @@ def main():
     jd_file = st.file_uploader("Choose JD file (PDF or TXT)", type=["pdf", "txt"])
     jd_skills = []
     if jd_file:
-        jd_path = save_uploaded_file(jd_file)
-        cached_jd_skills = get_cached_skills(jd_file.name)
-        if cached_jd_skills:
-            jd_skills = cached_jd_skills
-        else:
-            jd_skills = extractor.process_jd(jd_path)
-            if jd_skills:
-                cache_skills(jd_file.name, jd_skills)
+        jd_data, jd_digest = read_uploaded_file(jd_file)
+        jd_skills = extract_jd_skills(jd_digest, jd_data, jd_file.name)
         if jd_skills:
             st.success("JD skills extracted successfully!")
             st.subheader("Extracted JD Skills")
@@ -109,25 +159,12 @@ def main():
     cv_files = st.file_uploader("Choose CV PDFs", type="pdf", accept_multiple_files=True)
     cv_skills_list: List[Tuple[str, List[str]]] = []
     if cv_files:
-        texts = []
-        file_names = []
-        is_jd_list = [False] * len(cv_files)
-        for cv_file in cv_files:
-            cv_path = save_uploaded_file(cv_file)
-            cached_cv_skills = get_cached_skills(cv_file.name)
-            if cached_cv_skills:
-                cv_skills_list.append((cv_file.name, cached_cv_skills))
-            else:
-                text = extractor.extract_text_from_pdf(cv_path)
-                if text:
-                    texts.append(text)
-                    file_names.append(cv_file.name)
-        if texts:
-            batch_skills = extractor.batch_extract_skills(texts, is_jd_list)
-            for name, skills in zip(file_names, batch_skills):
-                if skills:
-                    cache_skills(name, skills)
-                    cv_skills_list.append((name, skills))
+        batch_skills = extract_cv_skills([
+            (cv_file.name, *read_uploaded_file(cv_file)) for cv_file in cv_files
+        ])
+        for cv_file, skills in zip(cv_files, batch_skills):
+            if skills:
+                cv_skills_list.append((cv_file.name, skills))
         if cv_skills_list:
             st.success(f"{len(cv_skills_list)} CVs processed successfully!")
 
@@ -141,18 +178,16 @@ def main():
                         st.success("Matching complete!")
                         st.subheader("Ranked CV Matches")
                         
-                        # Display results in a table
-                        data = []
-                        for result in ranked_results:
-                            data.append({
-                                "CV Name": result.cv_id,
-                                "Similarity Score": f"{result.similarity_score:.2f}",
-                                "Matched Skills": ", ".join(result.matched_skills),
-                                "CV Skills Count": result.total_cv_skills,
-                                "JD Skills Count": result.total_jd_skills
-                            })
-                        
-                        df = pd.DataFrame(data)
+                        # Display results in a table (built column by column)
+                        df = pd.DataFrame({
+                            "CV Name": [r.cv_id for r in ranked_results],
+                            "Similarity Score": [r.similarity_score for r in ranked_results],
+                            "Matched Skills": [r.matched_skills for r in ranked_results],
+                            "CV Skills Count": [r.total_cv_skills for r in ranked_results],
+                            "JD Skills Count": [r.total_jd_skills for r in ranked_results]
+                        })
+                        df["Similarity Score"] = df["Similarity Score"].round(2)
+                        df["Matched Skills"] = df["Matched Skills"].map(", ".join)
                         st.table(df)
                         
                         # Download results as CSV
@@ -0,0 +1,29 @@
+import copy
+import functools
+import os
+import orjson
+import yaml
+from typing import Any, Dict
+
+# libyaml's C loader when PyYAML was built with it
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+@functools.lru_cache(maxsize=8)
+def _read_config(path: str, mtime: float) -> Dict[str, Any]:
+    """Parse a YAML config file; cached per path and modification time."""
+    with open(path, 'r') as file:
+        return yaml.load(file, Loader=_YAML_LOADER)
+
+@functools.lru_cache(maxsize=8)
+def _read_skills(path: str, mtime: float) -> Dict[str, Dict[str, list]]:
+    """Parse a skill dictionary JSON file; cached per path and modification time."""
+    with open(path, 'rb') as file:
+        return orjson.loads(file.read())
+
+def load_config(path: str) -> Dict[str, Any]:
+    """Return a private copy of the parsed config (callers may modify it)."""
+    return copy.deepcopy(_read_config(path, os.path.getmtime(path)))
+
+def load_skills(path: str) -> Dict[str, Dict[str, list]]:
+    """Return the parsed skill dictionary, shared between callers (treat as read-only)."""
+    return _read_skills(path, os.path.getmtime(path))
@@ -0,0 +1,16 @@
+import logging
+import os
+from logging.handlers import RotatingFileHandler
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+def get_logger(name: str, path: str, level: int = logging.INFO) -> logging.Logger:
+    """Return a logger writing to a size-capped rotating file, attaching the handler only once."""
+    logger = logging.getLogger(name)
+    if not any(isinstance(handler, RotatingFileHandler) for handler in logger.handlers):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        handler = RotatingFileHandler(path, maxBytes=10_000_000, backupCount=3)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        logger.addHandler(handler)
+    logger.setLevel(level)
+    return logger
@@ -0,0 +1,12 @@
+import functools
+import spacy
+from typing import Tuple
+
+@functools.lru_cache(maxsize=4)
+def load_model(model_name: str, exclude: Tuple[str, ...] = ()) -> spacy.language.Language:
+    """Load a Spacy model once per process and share it between instances."""
+    nlp = spacy.load(model_name, exclude=list(exclude))
+    # Fall back to rule-based sentence splitting when no parser is loaded
+    if not nlp.has_pipe("parser") and not nlp.has_pipe("senter"):
+        nlp.add_pipe("sentencizer")
+    return nlp
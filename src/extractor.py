@@ -1,30 +1,153 @@
-import pdfplumber
-import spacy
-import yaml
+import fitz
+from spacy.matcher import PhraseMatcher
+from spacy.tokens import Doc
 import logging
 import os
-import json
-from typing import List, Optional
+import pickle
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Tuple, Union
+from src._config import load_config, load_skills
+from src._logging import get_logger
+from src._spacy import load_model
+
+try:
+    import ahocorasick
+except ImportError:  # optional: the "phrase" skill matcher needs only Spacy
+    ahocorasick = None
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+SKILLS_PATH = "data/skills.json"
+# Pickled automaton built from SKILLS_PATH, rebuilt whenever its patterns change
+AUTOMATON_CACHE_PATH = "data/skills_ac.pkl"
+
+# Sentences containing any of these mark a JD's requirements section
+JD_INDICATORS = ["required", "qualifications", "skills", "must have"]
+
+# PDFs with at least this many pages are split across worker processes
+PARALLEL_PAGE_THRESHOLD = 32
+PDF_MAX_WORKERS = 4
+
+def _is_word_char(char: str) -> bool:
+    """Return True for characters that continue a word (letters, digits, underscore)."""
+    return char.isalnum() or char == "_"
+
+# Per-process automaton used by batch scan workers (set by _init_scan_worker)
+_worker_automaton = None
+
+def _build_automaton(payloads: Dict[str, Tuple[int, int]]) -> "ahocorasick.Automaton":
+    """Build an Aho-Corasick automaton mapping each word to (length, skill bit)."""
+    automaton = ahocorasick.Automaton()
+    for word, payload in payloads.items():
+        automaton.add_word(word, payload)
+    automaton.make_automaton()
+    return automaton
+
+def _load_automaton(payloads: Dict[str, Tuple[int, int]],
+                    cache_path: str = AUTOMATON_CACHE_PATH) -> "ahocorasick.Automaton":
+    """Load the pickled automaton if it was built from the same payloads, else build it and pickle it."""
+    try:
+        with open(cache_path, 'rb') as file:
+            cached_payloads, automaton = pickle.load(file)
+        # A renamed skill or synonym keeps the word count but shifts the bits
+        if cached_payloads == payloads:
+            return automaton
+    except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError):
+        pass
+    automaton = _build_automaton(payloads)
+    try:
+        # Write to a temporary file and swap it in, so readers never see a partial pickle
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path) or ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                pickle.dump((payloads, automaton), file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        logger.warning(f"Could not write automaton cache {cache_path}: {str(e)}")
+    return automaton
+
+def _automaton_mask(automaton: "ahocorasick.Automaton", text: str) -> int:
+    """Return the bitmask of skills whose patterns occur as whole words in text."""
+    text_lower = text.lower()
+    last = len(text_lower) - 1
+    mask = 0
+    for end, (length, bit) in automaton.iter(text_lower):
+        start = end - length + 1
+        # Only accept whole-word hits (e.g. 'js' but not the 'js' in 'json')
+        if start > 0 and _is_word_char(text_lower[start - 1]):
+            continue
+        if end < last and _is_word_char(text_lower[end + 1]):
+            continue
+        mask |= bit
+    return mask
+
+def _init_scan_worker(payloads: Dict[str, Tuple[int, int]]):
+    """Build the automaton once per worker process."""
+    global _worker_automaton
+    _worker_automaton = _build_automaton(payloads)
+
+def _scan_worker(text: str) -> int:
+    """Scan one text in a worker process."""
+    return _automaton_mask(_worker_automaton, text)
+
+def _open_pdf(source: Union[str, bytes]) -> fitz.Document:
+    """Open a PDF from a file path or from in-memory bytes."""
+    if isinstance(source, str):
+        return fitz.open(source)
+    return fitz.open(stream=source, filetype="pdf")
+
+def _read_page_range(source: Union[str, bytes], start: int, stop: int) -> str:
+    """Read the text of pages [start, stop) of a PDF (runs in a worker process)."""
+    with _open_pdf(source) as doc:
+        return "".join(doc[i].get_text("text") for i in range(start, stop))
+
+def read_pdf_text(source: Union[str, bytes], max_workers: int = PDF_MAX_WORKERS,
+                  min_pages: int = PARALLEL_PAGE_THRESHOLD) -> str:
+    """Read the text of every page of a PDF (path or bytes) with PyMuPDF."""
+    # Worker processes cost tens of ms to start, so never start more than the
+    # host has CPUs and keep short documents on the serial path
+    max_workers = min(max_workers, os.cpu_count() or 1)
+    with _open_pdf(source) as doc:
+        page_count = doc.page_count
+        if max_workers <= 1 or page_count < min_pages:
+            return "".join(page.get_text("text") for page in doc)
+    
+    # PyMuPDF is not thread-safe, so long documents are split into page
+    # ranges that each worker process opens independently
+    step = -(-page_count // max_workers)
+    starts = list(range(0, page_count, step))
+    stops = [min(start + step, page_count) for start in starts]
+    with ProcessPoolExecutor(max_workers=len(starts)) as executor:
+        parts = executor.map(_read_page_range, [source] * len(starts), starts, stops)
+        return "".join(parts)
 
 class SkillExtractor:
     def __init__(self, config_path: str = "config.yaml"):
         """Initialize the SkillExtractor with configuration and Spacy model."""
         # Load configuration
-        with open(config_path, 'r') as file:
-            self.config = yaml.safe_load(file)
-        
-        # Set up logging
-        os.makedirs(self.config['paths']['logs'], exist_ok=True)
-        logging.basicConfig(
-            filename=os.path.join(self.config['paths']['logs'], 'extractor.log'),
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s'
+        self.config = load_config(config_path)
+        
+        # Set up logging; warnings and errors always reach the log file, info is opt-in
+        log_config = self.config.get('logging', {})
+        self.logger = get_logger(
+            __name__, os.path.join(self.config['paths']['logs'], 'extractor.log'),
+            level=logging.INFO if log_config.get('enabled', False) else logging.WARNING
         )
-        self.logger = logging.getLogger(__name__)
         
         # Load Spacy model
         try:
-            self.nlp = spacy.load(self.config['extractor']['model'])
+            # Only sentence boundaries are needed (JD requirement sentences)
+            self.nlp = load_model(
+                self.config['extractor']['model'],
+                tuple(self.config['extractor'].get('exclude', []))
+            )
             self.logger.info(f"Loaded Spacy model: {self.config['extractor']['model']}")
         except Exception as e:
             self.logger.error(f"Failed to load Spacy model: {str(e)}")
@@ -32,20 +155,69 @@ class SkillExtractor:
         
         # Load skill dictionary
         try:
-            with open("data/skills.json", 'r') as file:
-                self.skill_dict = json.load(file)
+            self.skill_dict = load_skills(SKILLS_PATH)
+            # Flat map from every skill and synonym (lowercased) to its
+            # canonical name, so matches never walk the dictionary again
             self.skill_patterns = []
+            self._syn_to_canonical = {}
             for category in self.skill_dict.values():
-                for skill, synonyms in category.items():
-                    self.skill_patterns.append(skill)
-                    self.skill_patterns.extend(synonyms)
+                for canonical, synonyms in category.items():
+                    for pattern in [canonical] + synonyms:
+                        self.skill_patterns.append(pattern)
+                        self._syn_to_canonical[pattern.lower()] = canonical
             self.logger.info("Loaded skill dictionary")
         except Exception as e:
             self.logger.error(f"Failed to load skill dictionary: {str(e)}")
             raise
+        
+        # Canonical skills are a small fixed vocabulary, so matches accumulate
+        # into an int bitmask (bit i = self._canon_names[i]) instead of a set
+        self._canon_names = sorted(set(self._syn_to_canonical.values()))
+        self._canon_id = {canonical: i for i, canonical in enumerate(self._canon_names)}
+        
+        # Build one matcher that finds every pattern in a single pass: an
+        # Aho-Corasick automaton by default, or Spacy's PhraseMatcher
+        backend = self.config['extractor'].get('skill_matcher', 'aho_corasick')
+        if backend not in ('aho_corasick', 'phrase'):
+            self.logger.error(f"Unknown skill matcher: {backend}. Must be 'aho_corasick' or 'phrase'")
+            raise ValueError(f"Unknown skill matcher: {backend}")
+        if backend == 'aho_corasick' and ahocorasick is None:
+            self.logger.warning("pyahocorasick is not installed; using the phrase skill matcher")
+            backend = 'phrase'
+        self._ac = None
+        self._pm = None
+        if backend == 'aho_corasick':
+            self._ac_payloads = {
+                synonym: (len(synonym), 1 << self._canon_id[canonical])
+                for synonym, canonical in self._syn_to_canonical.items()
+            }
+            self._ac = _load_automaton(self._ac_payloads)
+        else:
+            # Match IDs are the canonical names' StringStore hashes
+            self._pm = PhraseMatcher(self.nlp.vocab, attr="LOWER")
+            synonyms = list(self._syn_to_canonical)
+            for synonym, pattern in zip(synonyms, self.nlp.tokenizer.pipe(synonyms)):
+                self._pm.add(self._syn_to_canonical[synonym], [pattern])
+            self._match_id_to_bit = {
+                self.nlp.vocab.strings[canonical]: 1 << i for i, canonical in enumerate(self._canon_names)
+            }
+        # Single-token synonyms keyed by their StringStore hash, matching Token.lower
+        self._syn_hash_to_bit = {
+            self.nlp.vocab.strings.add(synonym): 1 << self._canon_id[canonical]
+            for synonym, canonical in self._syn_to_canonical.items()
+            if " " not in synonym
+        }
+        # Letters and digits the synonyms are made of, in either case; spaces and
+        # punctuation only count if some synonym consists of nothing else
+        vocab = "".join(self._syn_to_canonical)
+        if all(any(c.isalnum() for c in synonym) for synonym in self._syn_to_canonical):
+            vocab = "".join(c for c in vocab if c.isalnum())
+        self._vocab_chars = frozenset(vocab + vocab.upper())
+        self._jd_re = re.compile("|".join(map(re.escape, JD_INDICATORS)), re.IGNORECASE)
+        self.logger.info(f"Built {backend} skill matcher")
 
-    def validate_file(self, file_path: str, allow_text: bool = False) -> bool:
-        """Validate the file (PDF or text for JDs)."""
+    def validate_file(self, file_path: str, allow_text: bool = False, size_bytes: Optional[int] = None) -> bool:
+        """Validate the file (PDF or text for JDs); pass size_bytes for in-memory files."""
         allowed_extensions = ['.pdf']
         if allow_text:
             allowed_extensions.append('.txt')
@@ -54,29 +226,35 @@ class SkillExtractor:
             self.logger.error(f"Invalid file format: {file_path}. Must be one of {allowed_extensions}")
             return False
         
-        file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
+        if size_bytes is None:
+            size_bytes = os.path.getsize(file_path)
+        file_size_mb = size_bytes / (1024 * 1024)
         if file_size_mb > self.config['extractor']['max_file_size_mb']:
             self.logger.error(f"File {file_path} exceeds size limit of {self.config['extractor']['max_file_size_mb']} MB")
             return False
         
         return True
 
+    def _pdf_parallelism(self) -> Tuple[int, int]:
+        """Return (max_workers, min_pages) for splitting PDF pages across processes."""
+        return (
+            self.config['extractor'].get('pdf_workers', PDF_MAX_WORKERS),
+            self.config['extractor'].get('pdf_parallel_min_pages', PARALLEL_PAGE_THRESHOLD)
+        )
+
     def extract_text_from_pdf(self, file_path: str) -> Optional[str]:
         """Extract text from a PDF file."""
         if not self.validate_file(file_path):
             return None
         
         try:
-            with pdfplumber.open(file_path) as pdf:
-                text = ""
-                for page in pdf.pages:
-                    page_text = page.extract_text() or ""
-                    text += page_text
-                if not text.strip():
-                    self.logger.error(f"No text extracted from {file_path}")
-                    return None
+            text = read_pdf_text(file_path, *self._pdf_parallelism())
+            if not text.strip():
+                self.logger.error(f"No text extracted from {file_path}")
+                return None
+            if self.logger.isEnabledFor(logging.INFO):
                 self.logger.info(f"Successfully extracted text from {file_path}")
-                return text
+            return text
         except Exception as e:
             self.logger.error(f"Failed to extract text from {file_path}: {str(e)}")
             return None
@@ -92,12 +270,33 @@ class SkillExtractor:
                 if not text.strip():
                     self.logger.error(f"No text extracted from {file_path}")
                     return None
-                self.logger.info(f"Successfully extracted text from {file_path}")
+                if self.logger.isEnabledFor(logging.INFO):
+                    self.logger.info(f"Successfully extracted text from {file_path}")
                 return text
         except Exception as e:
             self.logger.error(f"Failed to extract text from {file_path}: {str(e)}")
             return None
 
+    def extract_text_from_bytes(self, data: bytes, file_name: str, allow_text: bool = False) -> Optional[str]:
+        """Extract text from an in-memory PDF (or text file for JDs) without touching disk."""
+        if not self.validate_file(file_name, allow_text=allow_text, size_bytes=len(data)):
+            return None
+        
+        try:
+            if file_name.lower().endswith('.pdf'):
+                text = read_pdf_text(data, *self._pdf_parallelism())
+            else:
+                text = data.decode('utf-8')
+            if not text.strip():
+                self.logger.error(f"No text extracted from {file_name}")
+                return None
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(f"Successfully extracted text from {file_name}")
+            return text
+        except Exception as e:
+            self.logger.error(f"Failed to extract text from {file_name}: {str(e)}")
+            return None
+
     def extract_skills(self, text: str, is_jd: bool = False) -> List[str]:
         """Extract skills from text using NLP and pattern matching."""
         if not text:
@@ -105,55 +304,71 @@ class SkillExtractor:
             return []
         
         try:
-            doc = self.nlp(text.lower())
-            skills = set()  # Use set to avoid duplicates
-            
-            # Pattern matching with skill dictionary
-            for skill in self.skill_patterns:
-                if skill in text.lower():
-                    # Map synonym to canonical skill
-                    for category in self.skill_dict.values():
-                        for canonical, synonyms in category.items():
-                            if skill == canonical or skill in synonyms:
-                                skills.add(canonical)
-            
-            # Extract noun phrases for CVs or JDs
-            for chunk in doc.noun_chunks:
-                for skill in self.skill_patterns:
-                    if skill in chunk.text.lower():
-                        for category in self.skill_dict.values():
-                            for canonical, synonyms in category.items():
-                                if skill == canonical or skill in synonyms:
-                                    skills.add(canonical)
-            
-            # JD-specific: Look for sections like 'requirements' or 'qualifications'
-            if is_jd:
-                jd_indicators = ["required", "qualifications", "skills", "must have"]
-                for sent in doc.sents:
-                    if any(indicator in sent.text.lower() for indicator in jd_indicators):
-                        for token in sent:
-                            for skill in self.skill_patterns:
-                                if token.text.lower() == skill:
-                                    for category in self.skill_dict.values():
-                                        for canonical, synonyms in category.items():
-                                            if skill == canonical or skill in synonyms:
-                                                skills.add(canonical)
-            
+            mask = self._match_mask(text)
+            # Short snippets have no sections worth parsing; the scan alone suffices
+            if is_jd and self._wants_nlp(text):
+                mask |= self._jd_section_mask(self.nlp(text))
+            skills = self._skills_from_mask(mask)
             if not skills:
                 self.logger.warning("No skills extracted from text")
-            else:
+            elif self.logger.isEnabledFor(logging.INFO):
                 self.logger.info(f"Extracted skills: {skills}")
-            return list(skills)
+            return skills
         except Exception as e:
             self.logger.error(f"Error during skill extraction: {str(e)}")
             return []
 
+    def _wants_nlp(self, text: str) -> bool:
+        """Whether a JD text is long enough to be worth running through spaCy."""
+        return (self.config['extractor'].get('use_nlp_for_jd', False)
+                and len(text) >= self.config['extractor'].get('fast_path_chars', 200))
+
+    def _match_mask(self, text: str) -> int:
+        """Find canonical skills in raw text with a single matcher pass."""
+        if self._pm is not None:
+            mask = 0
+            for match_id, _, _ in self._pm(self.nlp.make_doc(text)):
+                mask |= self._match_id_to_bit[match_id]
+            return mask
+        
+        return _automaton_mask(self._ac, text)
+
+    def _jd_section_mask(self, doc: Doc) -> int:
+        """Collect skills from JD sentences like 'requirements' or 'qualifications'."""
+        mask = 0
+        for sent in doc.sents:
+            if self._jd_re.search(sent.text):
+                for token in sent:
+                    mask |= self._syn_hash_to_bit.get(token.lower, 0)
+        return mask
+
+    def _skills_from_mask(self, mask: int) -> List[str]:
+        """Decode a skill bitmask into canonical skill names."""
+        return [name for i, name in enumerate(self._canon_names) if mask >> i & 1]
+
+    def scan_pdf(self, file_path: str) -> List[str]:
+        """Scan a PDF page by page for skills without building the full document text."""
+        if not self.validate_file(file_path):
+            return []
+        
+        try:
+            mask = 0
+            with _open_pdf(file_path) as doc:
+                for page in doc:
+                    mask |= self._match_mask(page.get_text("text"))
+            skills = self._skills_from_mask(mask)
+            if not skills:
+                self.logger.warning(f"No skills extracted from {file_path}")
+            elif self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(f"Extracted skills: {skills}")
+            return skills
+        except Exception as e:
+            self.logger.error(f"Failed to scan {file_path}: {str(e)}")
+            return []
+
     def process_cv(self, cv_path: str) -> List[str]:
         """Process a CV file and return extracted skills."""
-        text = self.extract_text_from_pdf(cv_path)
-        if text:
-            return self.extract_skills(text, is_jd=False)
-        return []
+        return self.scan_pdf(cv_path)
 
     def process_jd(self, jd_path: str) -> List[str]:
         """Process a JD file (PDF or text) and return extracted skills."""
@@ -172,42 +387,37 @@ class SkillExtractor:
             return []
         
         try:
-            docs = list(self.nlp.pipe([text.lower() for text in texts]))
-            batch_skills = []
-            for doc, text, is_jd in zip(docs, texts, is_jd_list):
-                skills = set()
-                # Pattern matching with skill dictionary
-                for skill in self.skill_patterns:
-                    if skill in text.lower():
-                        for category in self.skill_dict.values():
-                            for canonical, synonyms in category.items():
-                                if skill == canonical or skill in synonyms:
-                                    skills.add(canonical)
-                
-                # Extract noun phrases
-                for chunk in doc.noun_chunks:
-                    for skill in self.skill_patterns:
-                        if skill in chunk.text.lower():
-                            for category in self.skill_dict.values():
-                                for canonical, synonyms in category.items():
-                                    if skill == canonical or skill in synonyms:
-                                        skills.add(canonical)
-                
-                # JD-specific
-                if is_jd:
-                    jd_indicators = ["required", "qualifications", "skills", "must have"]
-                    for sent in doc.sents:
-                        if any(indicator in sent.text.lower() for indicator in jd_indicators):
-                            for token in sent:
-                                for skill in self.skill_patterns:
-                                    if token.text.lower() == skill:
-                                        for category in self.skill_dict.values():
-                                            for canonical, synonyms in category.items():
-                                                if skill == canonical or skill in synonyms:
-                                                    skills.add(canonical)
-                
-                batch_skills.append(list(skills))
-                self.logger.info(f"Batch extracted skills: {skills}")
+            # Skill scans are independent per text, so they can fan out to
+            # worker processes that each build the automaton once. Texts sharing
+            # no letter or digit with the skill vocabulary (blank pages of scanned
+            # PDFs, non-Latin text) cannot match and are skipped outright
+            candidates = [i for i, text in enumerate(texts) if not self._vocab_chars.isdisjoint(text)]
+            processes = self.config['extractor'].get('scan_processes', 1)
+            if self._ac is not None and processes > 1 and len(candidates) > 1:
+                with Pool(min(processes, len(candidates)), initializer=_init_scan_worker,
+                          initargs=(self._ac_payloads,)) as pool:
+                    found = pool.map(_scan_worker, (texts[i] for i in candidates))
+            else:
+                found = [self._match_mask(texts[i]) for i in candidates]
+            masks = [0] * len(texts)
+            for i, mask in zip(candidates, found):
+                masks[i] = mask
+            
+            # Only JDs need parsing, for their requirement sentences
+            jd_indices = [i for i, is_jd in enumerate(is_jd_list)
+                          if is_jd and self._wants_nlp(texts[i])]
+            docs = self.nlp.pipe(
+                (texts[i] for i in jd_indices),
+                batch_size=self.config['extractor'].get('batch_size', 64),
+                n_process=self.config['extractor'].get('n_process', 1)
+            )
+            for i, doc in zip(jd_indices, docs):
+                masks[i] |= self._jd_section_mask(doc)
+            
+            batch_skills = [self._skills_from_mask(mask) for mask in masks]
+            if self.logger.isEnabledFor(logging.INFO):
+                for skills in batch_skills:
+                    self.logger.info(f"Batch extracted skills: {skills}")
             return batch_skills
         except Exception as e:
             self.logger.error(f"Error in batch extraction: {str(e)}")
@@ -1,9 +1,12 @@
-import spacy
-import yaml
-import logging
+import numpy as np
+from numba import njit
 import os
+import functools
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
+from src._config import load_config
+from src._logging import get_logger
+from src._spacy import load_model
 
 @dataclass
 class MatchResult:
@@ -14,29 +17,69 @@ class MatchResult:
     total_cv_skills: int
     total_jd_skills: int
 
+@njit(cache=True, fastmath=True)
+def _score_pairs(pairwise: np.ndarray, threshold: float, boundaries: np.ndarray):
+    """Find each CV skill's best JD match and average the above-threshold matches per CV."""
+    rows, cols = pairwise.shape
+    best_indices = np.empty(rows, np.int64)
+    max_sims = np.empty(rows, np.float64)
+    passed = np.empty(rows, np.bool_)
+    for i in range(rows):
+        # Like Doc.similarity loops seeded at 0.0: no positive match leaves best = -1
+        best = -1
+        max_sim = 0.0
+        for j in range(cols):
+            if pairwise[i, j] > max_sim:
+                best = j
+                max_sim = pairwise[i, j]
+        best_indices[i] = best
+        max_sims[i] = max_sim
+        passed[i] = max_sim >= threshold
+    
+    # Segment averages: CV n owns rows boundaries[n] up to the next boundary
+    avg_pairwise = np.zeros(len(boundaries), np.float64)
+    for n in range(len(boundaries)):
+        stop = boundaries[n + 1] if n + 1 < len(boundaries) else rows
+        total = 0.0
+        count = 0
+        for i in range(boundaries[n], stop):
+            if passed[i]:
+                total += max_sims[i]
+                count += 1
+        if count > 0:
+            avg_pairwise[n] = total / count
+    return best_indices, max_sims, passed, avg_pairwise
+
 class SkillMatcher:
     def __init__(self, config_path: str = "config.yaml"):
         """Initialize the SkillMatcher with configuration and Spacy model."""
         # Load configuration
-        with open(config_path, 'r') as file:
-            self.config = yaml.safe_load(file)
+        self.config = load_config(config_path)
         
         # Set up logging
-        os.makedirs(self.config['paths']['logs'], exist_ok=True)
-        logging.basicConfig(
-            filename=os.path.join(self.config['paths']['logs'], 'matcher.log'),
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s'
-        )
-        self.logger = logging.getLogger(__name__)
+        self.logger = get_logger(__name__, os.path.join(self.config['paths']['logs'], 'matcher.log'))
         
         # Load Spacy model
         try:
-            self.nlp = spacy.load(self.config['extractor']['model'])
+            # Similarity only needs the tokenizer and the vocab's word vectors
+            self.nlp = load_model(
+                self.config['extractor']['model'],
+                tuple(self.config['extractor'].get('exclude', []))
+            )
             self.logger.info(f"Loaded Spacy model: {self.config['extractor']['model']}")
         except Exception as e:
             self.logger.error(f"Failed to load Spacy model: {str(e)}")
             raise
+        
+        # Memoize the vectors of each skill string for this instance
+        self._vectors = functools.lru_cache(maxsize=4096)(self._embed)
+
+    def _embed(self, skill: str) -> Tuple[np.ndarray, np.ndarray, Tuple[int, ...]]:
+        """Return a skill's L2-normalized Spacy vector, the sum of its token vectors and its token orths."""
+        doc = self.nlp(skill)
+        norm = doc.vector_norm
+        unit = doc.vector / norm if norm > 0 else np.zeros_like(doc.vector)
+        return unit, doc.vector * len(doc), tuple(token.orth for token in doc)
 
     def compute_similarity(self, cv_skills: List[str], jd_skills: List[str]) -> Tuple[float, List[str]]:
         """Compute semantic similarity between two lists of skills."""
@@ -45,46 +88,73 @@ class SkillMatcher:
             return 0.0, []
         
         try:
-            similarities = []
-            matched_skills = []
-            
-            # Process skills into Spacy documents for vector similarity
-            cv_doc = self.nlp(" ".join(cv_skills))
-            jd_doc = self.nlp(" ".join(jd_skills))
-            
-            # Compute overall document similarity (semantic overlap)
-            overall_similarity = cv_doc.similarity(jd_doc)
-            
-            # Pairwise skill matching for detailed results
-            for cv_skill in cv_skills:
-                cv_skill_doc = self.nlp(cv_skill)
-                max_sim = 0.0
-                best_match = None
-                for jd_skill in jd_skills:
-                    jd_skill_doc = self.nlp(jd_skill)
-                    sim = cv_skill_doc.similarity(jd_skill_doc)
-                    if sim > max_sim:
-                        max_sim = sim
-                        best_match = jd_skill
-                if max_sim >= self.config['matcher']['similarity_threshold']:
-                    similarities.append(max_sim)
-                    matched_skills.append(f"{cv_skill} -> {best_match} (sim: {max_sim:.2f})")
-            
-            # Average pairwise similarities (if any matches)
-            avg_pairwise_sim = sum(similarities) / len(similarities) if similarities else 0.0
+            return self._score_cvs([cv_skills], jd_skills)[0]
+        except Exception as e:
+            self.logger.error(f"Error computing similarity: {str(e)}")
+            return 0.0, []
+
+    def _score_cvs(self, cv_skill_lists: List[List[str]], jd_skills: List[str]) -> List[Tuple[float, List[str]]]:
+        """Score several CV skill lists against one JD with a single similarity matrix."""
+        results: List[Tuple[float, List[str]]] = [(0.0, []) for _ in cv_skill_lists]
+        filled = [i for i, cv_skills in enumerate(cv_skill_lists) if cv_skills]
+        if not jd_skills or len(filled) < len(cv_skill_lists):
+            self.logger.warning("Empty skill lists provided for similarity computation")
+        if not jd_skills or not filled:
+            return results
+        
+        # Stack every CV's skill vectors into one matrix; boundaries mark the
+        # first row of each CV so per-CV stats come from segment reductions
+        flat_skills = [skill for i in filled for skill in cv_skill_lists[i]]
+        boundaries = np.cumsum([0] + [len(cv_skill_lists[i]) for i in filled[:-1]])
+        cv_units, cv_sums, cv_orths = zip(*(self._vectors(skill) for skill in flat_skills))
+        jd_units, jd_sums, jd_orths = zip(*(self._vectors(skill) for skill in jd_skills))
+        cv_matrix = np.vstack(cv_units)
+        jd_matrix = np.vstack(jd_units)
+        
+        # Pairwise skill matching: best JD skill for every CV skill at once,
+        # then the average of the above-threshold matches per CV. Doc.similarity
+        # is exactly 1.0 for identical token sequences (even out-of-vocabulary
+        # ones), which float32 dot products would otherwise miss
+        pairwise = cv_matrix @ jd_matrix.T
+        token_ids: Dict[Tuple[int, ...], int] = {}
+        cv_ids = np.array([token_ids.setdefault(orths, len(token_ids)) for orths in cv_orths])
+        jd_ids = np.array([token_ids.setdefault(orths, len(token_ids)) for orths in jd_orths])
+        pairwise[cv_ids[:, None] == jd_ids[None, :]] = 1.0
+        best_indices, max_sims, passed, avg_pairwise = _score_pairs(
+            pairwise, float(self.config['matcher']['similarity_threshold']), boundaries
+        )
+        
+        # Overall similarity (semantic overlap): cosine of the token-vector
+        # sums, equivalent to comparing Docs built from the joined skills
+        cv_totals = np.add.reduceat(np.vstack(cv_sums), boundaries)
+        jd_total = np.sum(jd_sums, axis=0)
+        norms = np.linalg.norm(cv_totals, axis=1) * np.linalg.norm(jd_total)
+        overall = np.divide(cv_totals @ jd_total, norms, out=np.zeros(len(filled)), where=norms > 0)
+        jd_tokens = tuple(orth for orths in jd_orths for orth in orths)
+        for n in range(len(filled)):
+            stop = boundaries[n + 1] if n + 1 < len(filled) else len(flat_skills)
+            if tuple(orth for orths in cv_orths[boundaries[n]:stop] for orth in orths) == jd_tokens:
+                overall[n] = 1.0
+        
+        for n, i in enumerate(filled):
+            cv_skills = cv_skill_lists[i]
+            start = boundaries[n]
+            matched_skills = [
+                f"{cv_skill} -> {jd_skills[best_indices[row]] if best_indices[row] >= 0 else None} (sim: {max_sims[row]:.2f})"
+                for row, cv_skill in enumerate(cv_skills, start)
+                if passed[row]
+            ]
             
             # Final score: weighted average of overall and pairwise (emphasize pairwise for precision)
-            final_score = (overall_similarity + avg_pairwise_sim) / 2
+            final_score = float(overall[n] + avg_pairwise[n]) / 2
             
             self.logger.info(f"Computed similarity: {final_score:.2f} between CV skills {cv_skills} and JD skills {jd_skills}")
-            return final_score, matched_skills
-        except Exception as e:
-            self.logger.error(f"Error computing similarity: {str(e)}")
-            return 0.0, []
+            results[i] = (final_score, matched_skills)
+        return results
 
-    def match_cv_to_jd(self, cv_skills: List[str], jd_skills: List[str], cv_id: str = "CV_1") -> Optional[MatchResult]:
-        """Match a single CV to a JD and return results."""
-        score, matched = self.compute_similarity(cv_skills, jd_skills)
+    def _to_match_result(self, cv_id: str, cv_skills: List[str], jd_skills: List[str],
+                         score: float, matched: List[str]) -> Optional[MatchResult]:
+        """Build a MatchResult if the score clears the similarity threshold."""
         if score >= self.config['matcher']['similarity_threshold']:
             return MatchResult(
                 cv_id=cv_id,
@@ -96,11 +166,23 @@ class SkillMatcher:
         self.logger.info(f"CV {cv_id} similarity score {score:.2f} below threshold {self.config['matcher']['similarity_threshold']}")
         return None
 
+    def match_cv_to_jd(self, cv_skills: List[str], jd_skills: List[str], cv_id: str = "CV_1") -> Optional[MatchResult]:
+        """Match a single CV to a JD and return results."""
+        score, matched = self.compute_similarity(cv_skills, jd_skills)
+        return self._to_match_result(cv_id, cv_skills, jd_skills, score, matched)
+
     def rank_cvs_against_jd(self, cv_skills_list: List[Tuple[str, List[str]]], jd_skills: List[str]) -> List[MatchResult]:
         """Rank multiple CVs against a single JD."""
+        try:
+            # Score all CVs in one pass so the JD is embedded only once
+            scored = self._score_cvs([cv_skills for _, cv_skills in cv_skills_list], jd_skills)
+        except Exception as e:
+            self.logger.error(f"Error computing similarity: {str(e)}")
+            scored = [(0.0, []) for _ in cv_skills_list]
+        
         results = []
-        for cv_id, cv_skills in cv_skills_list:
-            match_result = self.match_cv_to_jd(cv_skills, jd_skills, cv_id)
+        for (cv_id, cv_skills), (score, matched) in zip(cv_skills_list, scored):
+            match_result = self._to_match_result(cv_id, cv_skills, jd_skills, score, matched)
             if match_result:
                 results.append(match_result)
         
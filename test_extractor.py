@@ -1,7 +1,53 @@
-from src.extractor import SkillExtractor
+import os
+import tempfile
+from src.extractor import SkillExtractor, _automaton_mask, _load_automaton
+
+def check_skills_from_mask(extractor):
+    """Decoded skills come back sorted, unique and round-trip through the bitmask."""
+    text = "Teamwork, SQL and Python programming; python again, plus ML and JS."
+    skills = extractor.extract_skills(text)
+    assert skills == sorted(set(skills)), skills
+    assert skills == ["javascript", "machine learning", "python", "sql", "teamwork"], skills
+    mask = sum(1 << extractor._canon_id[skill] for skill in skills)
+    assert extractor._skills_from_mask(mask) == skills
+    assert extractor._skills_from_mask(0) == []
+    print("Skill bitmask decodes in sorted order")
+
+def check_word_boundaries(extractor):
+    """Synonyms only match as whole words."""
+    assert extractor.extract_skills("JSON, html and xml") == []
+    assert extractor.extract_skills("js") == ["javascript"]
+    assert extractor.extract_skills("(pm)") == ["project management"]
+    assert extractor.batch_extract_skills(["json", "js."], [False, False]) == [[], ["javascript"]]
+    print("Skills match on word boundaries only")
+
+def check_automaton_cache():
+    """A pickled automaton is only reused for the exact patterns it was built from."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, "skills_ac.pkl")
+        payloads = {"java": (4, 1), "python": (6, 2), "js": (2, 4)}
+        assert _automaton_mask(_load_automaton(payloads, cache_path), "python and js") == 6
+        assert _automaton_mask(_load_automaton(payloads, cache_path), "python and js") == 6
+        
+        # Same word count, different words and bits: the cache must be rebuilt
+        renamed = {"zig": (3, 2), "python": (6, 4), "ecmascript": (10, 1)}
+        automaton = _load_automaton(renamed, cache_path)
+        assert _automaton_mask(automaton, "python and js") == 4
+        assert _automaton_mask(automaton, "ECMAScript or zig") == 3
+        assert _automaton_mask(_load_automaton(renamed, cache_path), "zig") == 2
+        
+        # A corrupt cache is replaced rather than trusted
+        with open(cache_path, 'wb') as file:
+            file.write(b"not a pickle")
+        assert _automaton_mask(_load_automaton(payloads, cache_path), "java") == 1
+        assert os.listdir(tmp) == ["skills_ac.pkl"]
+    print("Automaton cache is invalidated when patterns change")
 
 def main():
+    check_automaton_cache()
     extractor = SkillExtractor()
+    check_skills_from_mask(extractor)
+    check_word_boundaries(extractor)
     skills = extractor.process_cv("uploads/cv_Adam_Chebbi.pdf")
     print(f"Extracted skills: {skills}")
 
@@ -1,6 +1,78 @@
-from src.matcher import SkillMatcher
+import numpy as np
+from src.matcher import SkillMatcher, _score_pairs
+
+def reference_similarity(matcher, cv_skills, jd_skills):
+    """Score skills with per-pair Doc.similarity, as the matcher originally did."""
+    threshold = matcher.config['matcher']['similarity_threshold']
+    overall = matcher.nlp(" ".join(cv_skills)).similarity(matcher.nlp(" ".join(jd_skills)))
+    similarities = []
+    matched_skills = []
+    for cv_skill in cv_skills:
+        max_sim = 0.0
+        best_match = None
+        for jd_skill in jd_skills:
+            sim = matcher.nlp(cv_skill).similarity(matcher.nlp(jd_skill))
+            if sim > max_sim:
+                max_sim = sim
+                best_match = jd_skill
+        if max_sim >= threshold:
+            similarities.append(max_sim)
+            matched_skills.append(f"{cv_skill} -> {best_match} (sim: {max_sim:.2f})")
+    avg_pairwise = sum(similarities) / len(similarities) if similarities else 0.0
+    return (overall + avg_pairwise) / 2, matched_skills
+
+def check_against_doc_similarity(matcher):
+    """Vectorized scores must agree with Doc.similarity, including identical and out-of-vocabulary skills."""
+    cases = [
+        (["python", "java", "project management"], ["python", "javascript", "sql"]),
+        (["c++", "communication"], ["c++", "communication"]),
+        (["c++"], ["teamwork"]),
+    ]
+    original = matcher.config['matcher']['similarity_threshold']
+    for threshold in (0.0, original, 1.0):
+        matcher.config['matcher']['similarity_threshold'] = threshold
+        for cv_skills, jd_skills in cases:
+            score, matched = matcher.compute_similarity(cv_skills, jd_skills)
+            expected_score, expected_matched = reference_similarity(matcher, cv_skills, jd_skills)
+            assert abs(score - expected_score) < 1e-5, (threshold, cv_skills, score, expected_score)
+            assert matched == expected_matched, (threshold, cv_skills, matched, expected_matched)
+    matcher.config['matcher']['similarity_threshold'] = original
+    print("Scores agree with Doc.similarity")
+
+def reference_score_pairs(pairwise, threshold, boundaries):
+    """Plain numpy version of _score_pairs."""
+    row_max = pairwise.max(axis=1)
+    best_indices = np.where(row_max > 0, pairwise.argmax(axis=1), -1)
+    max_sims = np.maximum(row_max, 0.0)
+    passed = max_sims >= threshold
+    stops = list(boundaries[1:]) + [len(pairwise)]
+    avg_pairwise = np.array([
+        max_sims[start:stop][passed[start:stop]].mean() if passed[start:stop].any() else 0.0
+        for start, stop in zip(boundaries, stops)
+    ])
+    return best_indices, max_sims, passed, avg_pairwise
+
+def check_score_pairs():
+    """The JIT scoring kernel must agree with the numpy reference."""
+    rng = np.random.default_rng(0)
+    cases = [
+        # Several CV segments of different sizes
+        (rng.uniform(-1, 1, (7, 4)), np.array([0, 2, 3])),
+        # Empty segment in the middle (a CV with no skills)
+        (rng.uniform(-1, 1, (4, 3)), np.array([0, 2, 2])),
+        # Ties pick the first JD skill; all-negative rows have no best match
+        (np.array([[0.5, 0.9, 0.9], [0.9, 0.9, 0.2], [-0.3, -0.1, -0.2]]), np.array([0])),
+    ]
+    for pairwise, boundaries in cases:
+        for threshold in (-0.5, 0.0, 0.5, 1.0):
+            got = _score_pairs(pairwise, threshold, boundaries)
+            expected = reference_score_pairs(pairwise, threshold, boundaries)
+            for name, a, b in zip(("best_indices", "max_sims", "passed", "avg_pairwise"), got, expected):
+                assert np.allclose(a, b), (name, threshold, a, b)
+    print("Scoring kernel agrees with numpy reference")
 
 def main():
+    check_score_pairs()
     matcher = SkillMatcher()
     
     # Sample skills (from previous tests)
@@ -27,6 +99,8 @@ def main():
     print("\nRanked CVs:")
     for res in ranked_results:
         print(f"  {res.cv_id}: Score {res.similarity_score:.2f}")
+    
+    check_against_doc_similarity(matcher)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file